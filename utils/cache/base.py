@@ -1,43 +1,253 @@
 import abc
+import contextlib
+import functools
 import math
+import mmap
 import os
 import pickle
+import pickletools
+import sys
+import tempfile
 import threading
 import time
-from typing import Optional, Any, cast
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Optional, Any, Callable, Dict, Iterable, Iterator, List, Set, Tuple, Union, cast
 
+import numpy as np
+import pandas as pd
+import pyarrow as pa
 from cachetools import TTLCache
-from streamlit import util
 from streamlit.caching.cache_errors import CacheKeyNotFoundError, CacheError
-from streamlit.file_util import (
-    streamlit_read,
-    streamlit_write,
-)
 from streamlit.logger import get_logger
 
 _LOGGER = get_logger(__name__)
 
 _TTL_CACHE_TIMER = time.monotonic
 
+# Mode for new disk cache files, honouring the umask like open() does. The
+# umask can only be read by setting it, so do that once at import.
+_UMASK = os.umask(0)
+os.umask(_UMASK)
+_CACHE_FILE_MODE = 0o666 & ~_UMASK
+
+# Protocol 5 (PEP 574) writes large buffers such as numpy arrays with a single
+# copy instead of chunking them through the pickle stream.
+_PICKLE_PROTOCOL = 5
+
+# Upper bound on threads unlinking disk cache files in clear().
+_MAX_CLEAR_WORKERS = 8
+
+# Prefix marking a DataFrame serialized as an Arrow IPC stream. Pickle payloads
+# always start with the PROTO opcode (0x80), so the two can't be confused.
+_ARROW_TAG = b"ARROW1\0\0"
+
+# One-byte tags for small scalars stored as their plain encoding instead of
+# being pickled. None of them collide with the PROTO opcode or the Arrow tag.
+_SCALAR_TAGS = {str: b"S", bytes: b"Y", int: b"I", float: b"D", bool: b"B"}
+_SCALAR_DECODERS = {
+    b"S": lambda data: data.decode("utf-8", "surrogatepass"),
+    b"Y": lambda data: data,
+    b"I": int,
+    b"D": float,
+    b"B": lambda data: data == b"True",
+}
+# Scalars at least this large (per sys.getsizeof) are pickled as usual.
+_SCALAR_MAX_SIZE = 4096
+
+# Pickles larger than this skip pickletools.optimize, which is pure Python and
+# costs far more than pickling itself on big payloads.
+_OPTIMIZE_MAX_SIZE = 64 * 1024
+
+# Disk cache files at least this large are memory-mapped rather than read into
+# a bytes object, so their pages are loaded on demand while deserializing.
+_MMAP_THRESHOLD = 256 * 1024
+
+
+def _encode_scalar(value: Any) -> Optional[bytes]:
+    """Encode a small str, bytes, int, float or bool behind its tag, or return
+    None if the value isn't one. Subclasses such as enums or numpy scalars are
+    left to pickle.
+    """
+    tag = _SCALAR_TAGS.get(type(value))
+    if tag is None or sys.getsizeof(value) >= _SCALAR_MAX_SIZE:
+        return None
+    if tag == b"S":
+        return tag + value.encode("utf-8", "surrogatepass")
+    if tag == b"Y":
+        return tag + value
+    try:
+        # repr() round-trips exactly for ints, floats (including inf and nan)
+        # and bools.
+        return tag + repr(value).encode("ascii")
+    except ValueError:
+        # Ints past sys.get_int_max_str_digits() can't be converted to str.
+        return None
+
+
+def _encode_arrow(df: pd.DataFrame) -> Optional[bytes]:
+    """Encode a DataFrame as a tagged Arrow IPC stream, or return None if it
+    might not round-trip unchanged.
+
+    Arrow drops DataFrame subclasses, `attrs` and index `freq`, needs unique
+    string column names, and re-infers object and extension columns (object
+    ints come back as int64, strings with NaN as a different dtype). Only
+    plain frames with a RangeIndex and numeric, bool, datetime64 or
+    timedelta64 numpy columns take this path; everything else is pickled.
+    """
+    if type(df) is not pd.DataFrame or getattr(df, "attrs", None):
+        return None
+    if not isinstance(df.index, pd.RangeIndex):
+        return None
+    if not df.columns.is_unique or not all(isinstance(name, str) for name in df.columns):
+        return None
+    if not all(isinstance(dtype, np.dtype) and dtype.kind in "biufmM" for dtype in df.dtypes):
+        return None
+    try:
+        batch = pa.RecordBatch.from_pandas(df)
+        sink = pa.BufferOutputStream()
+        with pa.ipc.new_stream(sink, batch.schema) as writer:
+            writer.write_batch(batch)
+    except (pa.ArrowException, ValueError, TypeError):
+        # Columns Arrow can't convert from pandas.
+        return None
+    return _ARROW_TAG + sink.getvalue().to_pybytes()
+
+
+def _serialize(value: Any) -> bytes:
+    """Serialize a value for the disk cache. Small scalars are stored as their
+    plain encoding, DataFrames are written as Arrow IPC streams, which encode
+    columns as raw buffers, and everything else is pickled.
+    """
+    encoded = _encode_scalar(value)
+    if encoded is None and isinstance(value, pd.DataFrame):
+        encoded = _encode_arrow(value)
+    if encoded is not None:
+        return encoded
+    return pickle.dumps(value, protocol=_PICKLE_PROTOCOL)
+
+
+def _deserialize(payload: Union[bytes, mmap.mmap]) -> Any:
+    decode = _SCALAR_DECODERS.get(payload[:1])
+    if decode is not None:
+        return decode(payload[1:])
+    if payload[:len(_ARROW_TAG)] == _ARROW_TAG:
+        return pa.ipc.deserialize_pandas(pa.py_buffer(payload).slice(len(_ARROW_TAG)))
+    return pickle.loads(payload)
+
+
+@dataclass
+class _CachedEntry:
+    """A live value held by the memory cache. Values are only serialized
+    when written to the disk cache, so memory-only caches never pay for
+    pickling.
+    """
+
+    value: Any
+    # Approximate memory footprint in bytes; see MemoCache.max_bytes.
+    size: int = 0
+
+
+def _get_entry_size(entry: _CachedEntry) -> int:
+    return entry.size
+
+
+class _LRUCache(OrderedDict):
+    """An LRU mapping used instead of TTLCache when entries never expire,
+    without TTLCache's per-operation expiry bookkeeping. Like a cachetools
+    cache it tracks `currsize` through `getsizeof`, and `popitem()` removes
+    the least recently used item.
+    """
+
+    ttl = math.inf
+
+    def __init__(self, getsizeof: Callable[[Any], int]):
+        super().__init__()
+        self.getsizeof = getsizeof
+        self.currsize = 0
+
+    def __getitem__(self, key):
+        value = super().__getitem__(key)
+        self.move_to_end(key)
+        return value
+
+    def __setitem__(self, key, value):
+        if key in self:
+            self.currsize -= self.getsizeof(super().__getitem__(key))
+        super().__setitem__(key, value)
+        self.move_to_end(key)
+        self.currsize += self.getsizeof(value)
+
+    def __delitem__(self, key):
+        self.currsize -= self.getsizeof(super().__getitem__(key))
+        super().__delitem__(key)
+
+    def popitem(self, last: bool = False):
+        """Remove and return the least recently used item, like cachetools."""
+        if not self:
+            raise KeyError("popitem(): cache is empty")
+        key = next(reversed(self)) if last else next(iter(self))
+        value = super().__getitem__(key)
+        del self[key]
+        return key, value
+
+    def clear(self):
+        super().clear()
+        self.currsize = 0
+
 
 class MemoCache:
     """Manages cached values for a single st.memorized function."""
 
     cache_name: str = "_default"
 
+    # Cache directories already created, shared by all caches so cache
+    # operations don't re-stat the filesystem.
+    _dir_created: Set[str] = set()
+
     def __init__(
             self,
             persist: Optional[str] = "disk",
             ttl: float = math.inf,
             max_entries: float = math.inf,
+            max_bytes: float = math.inf,
     ):
         self.persist = persist
-        self._mem_cache = TTLCache(maxsize=max_entries, ttl=ttl, timer=_TTL_CACHE_TIMER)
-        self._mem_cache_lock = threading.Lock()
+        self._max_entries = max_entries
+        self._max_bytes = max_bytes
+        # Lookup counters, updated under _mem_cache_lock.
+        self._hits = 0
+        self._misses = 0
+        self._disk_hits = 0
+        # Both backends track the total entry size in `currsize`; MemoCache
+        # enforces max_entries and max_bytes itself on insert.
+        if math.isinf(ttl):
+            self._mem_cache = _LRUCache(getsizeof=_get_entry_size)
+        else:
+            self._mem_cache = TTLCache(
+                maxsize=math.inf, ttl=ttl, timer=_TTL_CACHE_TIMER, getsizeof=_get_entry_size
+            )
+        # Guards the mem cache structure only; never held across I/O.
+        self._mem_cache_lock = threading.RLock()
+        # Per-key locks serializing misses, with the number of callers holding
+        # or waiting on each; guarded by _key_locks_lock.
+        self._key_locks: Dict[str, List[Any]] = {}
+        self._key_locks_lock = threading.Lock()
 
     @property
     def max_entries(self) -> float:
-        return cast(float, self._mem_cache.maxsize)
+        return self._max_entries
+
+    @property
+    def max_bytes(self) -> float:
+        """Bound on the memory cache's size in bytes. DataFrames, Series and
+        scalars are sized by their deep memory usage. Other values are sized
+        by their serialized length, since `sys.getsizeof` doesn't count what
+        a container holds: disk-backed values reuse the payload written to
+        disk, and memory-only values are pickled for it when this is finite.
+        """
+        return self._max_bytes
 
     @property
     def ttl(self) -> float:
@@ -45,95 +255,318 @@ class MemoCache:
 
     @abc.abstractmethod
     def query(self, key):
+        """Fetch the value for a key on a cache miss.
+
+        `read_value` holds the key's lock while this runs. A query may read
+        other keys from the cache, but queries must not depend on each other
+        in a cycle (A reading B while B reads A), or concurrent misses
+        deadlock. `query_batch` runs without any key lock held.
+        """
         pass
 
     def read_value(self, key: str) -> Any:
         """Read a value from the cache. Raise `CacheKeyNotFoundError` if the
         value doesn't exist, and `CacheError` if the value exists but can't
         be unpickled.
+
+        Memory cache hits return the cached object itself rather than a copy,
+        so callers must not mutate it.
         """
         key = f"{self.cache_name}:{key}"
-        try:
-            pickled_value = self._read_from_mem_cache(key)
+        entry = self._peek_mem_cache(key)
+        if entry is not None:
+            return entry.value
+        if self.persist != "disk":
+            raise CacheKeyNotFoundError("Key not found in mem cache")
 
-        except CacheKeyNotFoundError as e:
-            if self.persist == "disk":
-                try:
-                    pickled_value = self._read_from_disk_cache(key)
-                    self._write_to_mem_cache(key, pickled_value)
-                except CacheKeyNotFoundError:
-                    value = self.query(key)
-                    pickled_value = self._write_value(key, value)
+        # Only one caller per key goes to disk or runs the query, the others
+        # wait here and then find the value in memory.
+        with self._key_lock(key):
+            # Already counted as a miss above.
+            entry = self._peek_mem_cache(key, record_stats=False)
+            if entry is None:
+                entry = self._load_from_disk_cache(key)
+            if entry is not None:
+                return entry.value
+
+            value = self.query(key)
+            return self._write_value(key, value)
+
+    def query_batch(self, keys: List[str]) -> Dict[str, Any]:
+        """Query several keys at once. Subclasses whose backend can overlap
+        requests should override this; by default keys are queried in turn.
+        """
+        return {key: self.query(key) for key in keys}
+
+    def read_values(self, keys: Iterable[str]) -> Dict[str, Any]:
+        """Read several values from the cache, returning them keyed as given.
+        Keys missing from both the memory and disk caches are fetched with a
+        single `query_batch` call instead of one query each.
+        """
+        values = {}
+        missing = {}
+        for key in keys:
+            cache_key = f"{self.cache_name}:{key}"
+            entry = self._peek_mem_cache(cache_key)
+            if entry is not None:
+                values[key] = entry.value
+            elif self.persist != "disk":
+                raise CacheKeyNotFoundError("Key not found in mem cache")
             else:
-                raise e
+                missing[cache_key] = key
+        if not missing:
+            return values
 
+        # Re-check each key under its lock, one at a time, in case another
+        # caller filled it meanwhile. No lock is held across query_batch: its
+        # queries may run on other threads and read other keys, so holding
+        # locks here could deadlock. A concurrent miss on the same key may
+        # therefore query it twice.
+        to_query = []
+        for cache_key, key in missing.items():
+            with self._key_lock(cache_key):
+                # Already counted as a miss above.
+                entry = self._peek_mem_cache(cache_key, record_stats=False)
+                if entry is None:
+                    entry = self._load_from_disk_cache(cache_key)
+            if entry is not None:
+                values[key] = entry.value
+            else:
+                to_query.append(cache_key)
+
+        if to_query:
+            for cache_key, value in self.query_batch(to_query).items():
+                values[missing[cache_key]] = self._write_value(cache_key, value)
+        return values
+
+    def _load_from_disk_cache(self, key: str) -> Optional[_CachedEntry]:
+        """Load a value from the disk cache into the memory cache. Return its
+        entry, or None if it isn't on disk.
+        """
+        pickled_value = self._peek_disk_cache(key)
+        if pickled_value is None:
+            return None
+
+        mapped = isinstance(pickled_value, mmap.mmap)
+        payload_size = len(pickled_value)
         try:
-            return pickle.loads(pickled_value)
-        except pickle.UnpicklingError as exc:
+            value = _deserialize(pickled_value)
+        except (pickle.UnpicklingError, EOFError, ValueError, pa.ArrowException) as exc:
             raise CacheError(f"Failed to unpickle {key}") from exc
+        finally:
+            if mapped:
+                try:
+                    pickled_value.close()
+                except BufferError:
+                    # Something still references the mapping (e.g. a zero-copy
+                    # Arrow column); it is unmapped once that is released.
+                    pass
+
+        entry = _CachedEntry(value, self._sizeof(value, payload_size))
+        self._write_to_mem_cache(key, entry)
+        with self._mem_cache_lock:
+            self._disk_hits += 1
+        return entry
+
+    def _write_value(self, key: str, value: Any) -> Any:
+        """Write a value to the cache. It must be pickleable if the cache
+        persists to disk.
+        """
+        if self.persist != "disk":
+            self._write_to_mem_cache(key, _CachedEntry(value, self._sizeof(value)))
+            return value
 
-    def _write_value(self, key: str, value: Any):
-        """Write a value to the cache. It must be pickleable."""
         try:
-            pickled_value = pickle.dumps(value)
+            pickled_value = _serialize(value)
         except pickle.PicklingError as exc:
+            self._write_to_mem_cache(key, _CachedEntry(value, self._sizeof(value)))
             raise CacheError(f"Failed to pickle {key}") from exc
 
-        self._write_to_mem_cache(key, pickled_value)
-        if self.persist == "disk":
-            self._write_to_disk_cache(key, pickled_value)
-        return pickled_value
+        # Cache in memory before the disk write, so a disk failure doesn't
+        # force the value to be queried again.
+        entry = _CachedEntry(value, self._sizeof(value, len(pickled_value)))
+        self._write_to_mem_cache(key, entry)
+
+        disk_value = pickled_value
+        if pickled_value[:1] == pickle.PROTO and len(pickled_value) <= _OPTIMIZE_MAX_SIZE:
+            # Disk copies are written once and read on every cold start, so
+            # strip the unused memo opcodes from small pickles to make them
+            # smaller and faster to load.
+            disk_value = pickletools.optimize(pickled_value)
+        self._write_to_disk_cache(key, disk_value)
+        return value
 
     def clear(self) -> None:
         with self._mem_cache_lock:
-            # We keep a lock for the entirety of the clear operation to avoid
-            # disk cache race conditions.
-            for key in self._mem_cache.keys():
-                self._remove_from_disk_cache(key)
-
+            keys = list(self._mem_cache.keys())
             self._mem_cache.clear()
 
-    def _read_from_mem_cache(self, key: str) -> bytes:
+        # Disk removal runs outside the lock so readers aren't blocked on it.
+        # A value re-cached meanwhile may lose its disk copy; that only costs
+        # a query on the next cold start.
+        self._clear_disk_cache(keys)
+
+    def _clear_disk_cache(self, keys: List[str]) -> None:
+        """Remove the disk copies of the given keys. Each removal is an
+        independent unlink, so they are spread over a thread pool.
+        """
+        if not keys:
+            return
+        with ThreadPoolExecutor(max_workers=min(_MAX_CLEAR_WORKERS, len(keys))) as executor:
+            # Consume the iterator so every removal has finished on return.
+            list(executor.map(self._remove_from_disk_cache, keys))
+
+    def get_stats(self) -> Dict[str, float]:
+        """Return memory cache hit and miss counts, disk cache hits among the
+        misses, and the number of entries and bytes held in memory (sized as
+        described under `max_bytes`).
+        """
+        with self._mem_cache_lock:
+            lookups = self._hits + self._misses
+            return {
+                "hits": self._hits,
+                "misses": self._misses,
+                "disk_hits": self._disk_hits,
+                "hit_ratio": self._hits / lookups if lookups else 0.0,
+                "entries": len(self._mem_cache),
+                "bytes": self._mem_cache.currsize,
+            }
+
+    @contextlib.contextmanager
+    def _key_lock(self, key: str) -> Iterator[None]:
+        """Hold the lock for one cache key. Locks are reentrant, created on
+        first use and dropped once no caller holds or waits on them.
+        """
+        with self._key_locks_lock:
+            slot = self._key_locks.get(key)
+            if slot is None:
+                slot = self._key_locks[key] = [threading.RLock(), 0]
+            slot[1] += 1
+        try:
+            with slot[0]:
+                yield
+        finally:
+            with self._key_locks_lock:
+                slot[1] -= 1
+                if not slot[1]:
+                    del self._key_locks[key]
+
+    def _peek_mem_cache(self, key: str, record_stats: bool = True) -> Optional[_CachedEntry]:
+        """Return the memory cache entry for a key, or None on a miss."""
         with self._mem_cache_lock:
             if key in self._mem_cache:
-                entry = bytes(self._mem_cache[key])
-                _LOGGER.debug("Memory cache HIT: %s", key)
-                return entry
+                if record_stats:
+                    self._hits += 1
+                return self._mem_cache[key]
 
             else:
-                _LOGGER.debug("Memory cache MISS: %s", key)
-                raise CacheKeyNotFoundError("Key not found in mem cache")
+                if record_stats:
+                    self._misses += 1
+                return None
 
-    def _read_from_disk_cache(self, key: str) -> bytes:
+    def _read_from_mem_cache(self, key: str) -> Any:
+        entry = self._peek_mem_cache(key)
+        if entry is None:
+            raise CacheKeyNotFoundError("Key not found in mem cache")
+        return entry.value
+
+    def _peek_disk_cache(self, key: str) -> Optional[Union[bytes, mmap.mmap]]:
+        """Return the disk cache payload for a key, or None on a miss. Raise
+        `CacheError` if the file exists but can't be read.
+
+        Files of at least `_MMAP_THRESHOLD` bytes are returned as a read-only
+        `mmap`, which the caller closes once it has deserialized the value.
+        """
         path = self._get_file_path(key)
         try:
-            with streamlit_read(path, binary=True) as input_file:
+            with open(path, "rb") as input_file:
+                size = os.fstat(input_file.fileno()).st_size
+                if size >= _MMAP_THRESHOLD:
+                    # The mapping stays valid after the file is closed.
+                    return mmap.mmap(input_file.fileno(), size, access=mmap.ACCESS_READ)
                 value = input_file.read()
-                _LOGGER.debug("Disk cache HIT: %s", key)
-                return bytes(value)
+                assert isinstance(value, bytes)
+                return value
         except FileNotFoundError:
-            raise CacheKeyNotFoundError("Key not found in disk cache")
+            return None
         except BaseException as e:
             _LOGGER.error(e)
             raise CacheError("Unable to read from cache") from e
 
-    def _write_to_mem_cache(self, key: str, pickled_value: bytes) -> None:
+    def _read_from_disk_cache(self, key: str) -> Union[bytes, mmap.mmap]:
+        value = self._peek_disk_cache(key)
+        if value is None:
+            raise CacheKeyNotFoundError("Key not found in disk cache")
+        return value
+
+    def _write_to_mem_cache(self, key: str, entry: _CachedEntry) -> None:
         with self._mem_cache_lock:
-            self._mem_cache[key] = pickled_value
+            self._mem_cache[key] = entry
+            # Evict least recently used entries until both limits hold.
+            while len(self._mem_cache) and (
+                    len(self._mem_cache) > self._max_entries
+                    or self._mem_cache.currsize > self._max_bytes
+            ):
+                self._mem_cache.popitem()
+
+    def _sizeof(self, value: Any, payload_size: Optional[int] = None) -> int:
+        """Approximate the memory held by a cached value, as described under
+        `max_bytes`. `payload_size` is the length of the value's serialized
+        form, if the caller already has it.
+        """
+        # pandas objects report their deep memory usage through __sizeof__.
+        if isinstance(value, (pd.DataFrame, pd.Series)) or type(value) in _SCALAR_TAGS:
+            return sys.getsizeof(value)
+        if payload_size is not None:
+            return payload_size
+        if math.isinf(self._max_bytes):
+            # Without a byte limit, don't pickle memory-only values just to size them.
+            return sys.getsizeof(value)
+        try:
+            return len(pickle.dumps(value, protocol=_PICKLE_PROTOCOL))
+        except Exception:
+            return sys.getsizeof(value)
 
     def _write_to_disk_cache(self, key: str, pickled_value: bytes) -> None:
-        path = self._get_file_path(key)
+        cache_dir, path = self._compute_path(key)
         try:
-            with streamlit_write(path, binary=True) as output:
-                output.write(pickled_value)
-        except util.Error as e:
+            self._ensure_dir(cache_dir)
+            try:
+                self._write_file_atomically(path, pickled_value)
+            except FileNotFoundError:
+                # The directory was removed since it was created (e.g. a
+                # manual cleanup); create it again and retry once.
+                self._dir_created.discard(cache_dir)
+                self._ensure_dir(cache_dir)
+                self._write_file_atomically(path, pickled_value)
+        except OSError as e:
             _LOGGER.debug(e)
-            # Clean up file so we don't leave zero byte files.
+            raise CacheError("Unable to write to cache") from e
+
+    @staticmethod
+    def _write_file_atomically(path: str, data: bytes) -> None:
+        """Write a file atomically: the data goes to a uniquely named temp file
+        in the same directory that is then renamed over `path`, so readers and
+        concurrent writers never see a partial file.
+        """
+        # mkstemp opens the file in binary mode (O_BINARY on Windows).
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        try:
+            try:
+                view = memoryview(data)
+                while view:
+                    view = view[os.write(fd, view):]
+            finally:
+                os.close(fd)
+            # mkstemp creates the file owner-only; match a file made by open().
+            os.chmod(tmp_path, _CACHE_FILE_MODE)
+            os.replace(tmp_path, path)
+        except BaseException:
             try:
-                os.remove(path)
-            except (FileNotFoundError, IOError, OSError):
+                os.remove(tmp_path)
+            except OSError:
                 pass
-            raise CacheError("Unable to write to cache") from e
+            raise
 
     def _remove_from_disk_cache(self, key: str) -> None:
         """Delete a cache file from disk. If the file does not exist on disk,
@@ -147,12 +580,24 @@ class MemoCache:
         except BaseException as e:
             _LOGGER.exception("Unable to remove a file from the disk cache", e)
 
-    @staticmethod
-    def _get_file_path(value_key: str) -> str:
+    @classmethod
+    def _get_file_path(cls, value_key: str) -> str:
         """Return the path of the disk cache file for the given value."""
+        cache_dir, path = cls._compute_path(value_key)
+        cls._ensure_dir(cache_dir)
+        return path
+
+    @staticmethod
+    @functools.lru_cache(maxsize=4096)
+    def _compute_path(value_key: str) -> Tuple[str, str]:
+        """Return the cache directory and absolute file path for a key."""
         _dir, file_name = value_key.split(":", 1)
         cache_dir = os.path.join(os.environ.get("CACHE_PATH", "./cache"), _dir)
-        if not os.path.exists(cache_dir):
-            os.makedirs(cache_dir)
         # absolute path to the file in the cache directory for the given key value pair (dir:file_name)
-        return os.path.abspath(os.path.join(cache_dir, f"{file_name}.memo"))
+        return cache_dir, os.path.abspath(os.path.join(cache_dir, f"{file_name}.memo"))
+
+    @classmethod
+    def _ensure_dir(cls, cache_dir: str) -> None:
+        if cache_dir not in cls._dir_created:
+            os.makedirs(cache_dir, exist_ok=True)
+            cls._dir_created.add(cache_dir)
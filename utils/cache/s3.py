@@ -1,15 +1,40 @@
+import math
+import os
 import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional
 
+import diskcache
 import pandas as pd
+from streamlit.caching.cache_errors import CacheError
+from streamlit.logger import get_logger
 
 from utils.cache.base import MemoCache
 
+_LOGGER = get_logger(__name__)
+
+# Upper bound on S3 requests in flight for one batch.
+_MAX_QUERY_WORKERS = 16
+
 
 class S3QueryCache(MemoCache):
-    """A cache that stores values in S3."""
+    """A cache that stores values in S3.
+
+    Query results are persisted in a SQLite-backed `diskcache.Cache` rather
+    than one file per key, so lookups go through an index and `clear()` is a
+    single transaction.
+    """
 
     cache_name = "S3Query"
 
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._disk = diskcache.Cache(
+            os.path.join(os.environ.get("CACHE_PATH", "./cache"), self.cache_name),
+            # Values larger than this are kept in their own file next to the index.
+            disk_min_file_size=2 ** 20,
+        )
+
     def query(self, key):
         # TODO: S3 Query
         # sleep
@@ -17,5 +42,36 @@ class S3QueryCache(MemoCache):
         print(f'S3 Query {key}')
         return pd.DataFrame([[1, 2, 3], [4, 5, 6]], columns=['a', 'b', 'c'])
 
+    def query_batch(self, keys: List[str]) -> Dict[str, Any]:
+        if not keys:
+            return {}
+        # S3 requests are I/O bound, so run them concurrently.
+        with ThreadPoolExecutor(max_workers=min(_MAX_QUERY_WORKERS, len(keys))) as executor:
+            return dict(zip(keys, executor.map(self.query, keys)))
+
+    def _clear_disk_cache(self, keys: List[str]) -> None:
+        self._disk.clear()
+
+    def _peek_disk_cache(self, key: str) -> Optional[bytes]:
+        try:
+            return self._disk.get(key)
+        except Exception as e:
+            _LOGGER.error(e)
+            raise CacheError("Unable to read from cache") from e
+
+    def _write_to_disk_cache(self, key: str, pickled_value: bytes) -> None:
+        expire = None if math.isinf(self.ttl) else self.ttl
+        try:
+            self._disk.set(key, pickled_value, expire=expire)
+        except Exception as e:
+            _LOGGER.debug(e)
+            raise CacheError("Unable to write to cache") from e
+
+    def _remove_from_disk_cache(self, key: str) -> None:
+        try:
+            self._disk.delete(key)
+        except Exception as e:
+            _LOGGER.exception("Unable to remove a value from the disk cache", e)
+
 
 s3_query = S3QueryCache()
@@ -1,28 +1,45 @@
+import functools
 import importlib
 import os
 import sys
+import types
 import typing
 from dataclasses import dataclass
 
 import streamlit as st
 
 PAGE_DIR = "./pages"
+NAVBAR_STYLES = frozenset(("Button", "SelectBox"))
 
 
-def import_page(app_name):
-    if not sys.modules.get(f"pages.{app_name}"):
-        importlib.import_module(f"pages.{app_name}")
-    else:
-        importlib.reload(importlib.import_module(f"pages.{app_name}"))
+# Compiled page code keyed by app name, along with the source mtime it was loaded from.
+_page_code: typing.Dict[str, typing.Tuple[float, types.CodeType]] = {}
 
 
+def import_page(app_name):
+    module_name = f"pages.{app_name}"
+    module = sys.modules.get(module_name)
+    if not module:
+        importlib.import_module(module_name)
+        return
+
+    # A page renders by running its module body, so it has to execute on every
+    # rerun; only fetch the code object again if the source file has changed.
+    mtime = os.stat(module.__file__).st_mtime
+    cached = _page_code.get(app_name)
+    if cached is None or cached[0] != mtime:
+        cached = _page_code[app_name] = (mtime, module.__spec__.loader.get_code(module_name))
+    exec(cached[1], module.__dict__)
+
+
+@functools.lru_cache(maxsize=1)
 def application_detection():
     """
     Detects if the application is running in a Streamlit app.
     """
 
-    page_path = [page_path for page_path in os.listdir(PAGE_DIR) if not page_path.startswith("__")]
-    return page_path
+    with os.scandir(PAGE_DIR) as entries:
+        return tuple(entry.name for entry in entries if not entry.name.startswith("__") and entry.is_file())
 
 
 page_path_list = application_detection()
@@ -35,6 +52,8 @@ class App:
 
 
 apps = [App(name=name[:-3], func=import_page) for name in page_path_list]
+app_names = [app.name for app in apps]
+apps_by_name = {app.name: app for app in apps}
 
 
 @dataclass
@@ -45,39 +64,37 @@ class MultiApp:
     navbar_extra = None
     current_app = apps[0]
 
+    def __post_init__(self):
+        # Everything below depends only on startup configuration, so build it
+        # once instead of on every rerender.
+        self._navbar_html = f"""<h1 style="text-align:center;">{self.navbar_name}</h1>"""
+        self._app_groups = [
+            apps[i:i + self.horizontal_max_button_size]
+            for i in range(0, len(apps), self.horizontal_max_button_size)
+        ]
+
     @staticmethod
     def _change_page(app: App) -> None:
         app.func(app.name)
 
     def _render_navbar(self, sidebar: st.sidebar) -> None:
         global apps
-        sidebar.markdown(
-            f"""<h1 style="text-align:center;">{self.navbar_name}</h1>""",
-            unsafe_allow_html=True,
-        )
+        sidebar.markdown(self._navbar_html, unsafe_allow_html=True)
         sidebar.text("\n")
 
-        possible_styles = ["Button", "SelectBox"]
-
-        if self.navbar_style not in possible_styles:
+        if self.navbar_style not in NAVBAR_STYLES:
             sidebar.warning("Invalid Navbar Style - Using Button")
             self.navbar_style = "HorizontalButton"
 
         if self.navbar_style == "Button":
-            app_list = []
-            for i, app in enumerate(apps):
-                if i % self.horizontal_max_button_size == 0:
-                    app_list.append([])
-                app_list[-1].append(app)
-            for app_group in app_list:
+            for app_group in self._app_groups:
                 columns = sidebar.columns(len(app_group))
                 for app, column in zip(app_group, columns):
                     if column.button(app.name):
                         self.current_app = app
         else:
-            app_names = [app.name for app in apps]
             app_name = sidebar.selectbox("", app_names)
-            self.current_app = [app for app in apps if app.name == app_name][0]
+            self.current_app = apps_by_name[app_name]
 
         if self.navbar_extra:
             self.navbar_extra.func(sidebar)